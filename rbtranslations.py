@@ -41,9 +41,22 @@ be used to define keys or values that have leading or trailing spaces.
 Translations are obtained by calling :func:`rbtranslations.translation`.
 The returned :class:`rbtranslations.Translations` provide a subset
 of the methods provided by the built-in :class:`gettext.NullTranslations`.
+In addition, all translations for keys with a common prefix can be
+obtained with :meth:`rbtranslations.BaseTranslations.section`. This is
+useful when using dotted keys such as "``menu.file.open``" and whole
+sections have to be passed on, e.g. to a browser.
 """
 import re
 import os
+import io
+import json
+import sys
+import bisect
+import collections
+import mmap
+import multiprocessing
+import zipfile
+import posixpath
 import threading
 
 __version__ = "0.9.5"
@@ -68,6 +81,11 @@ class BaseTranslations(object):
     """
 
     _fallback = None
+    _section_index = None
+    _section_json = None
+    _origin = None
+    section_json_cache_size = 64
+    """Number of serialized sections kept by :meth:`section_json`."""
 
     def __init__(self, language=None):
         """
@@ -99,6 +117,8 @@ class BaseTranslations(object):
                 if id(self) == id(value):
                     del Translations._cache[key]
                     break
+        self._section_index = None
+        self._section_json = None
         if self._fallback:
             self._fallback.add_fallback(fallback)
         else:
@@ -137,6 +157,143 @@ class BaseTranslations(object):
             return self._fallback.gettext(message)
         return message
 
+    def _index(self):
+        """
+        Return the sorted list of all keys defined in the chain
+        starting with this instance. The index is built when first
+        needed and kept together with the elements of the chain
+        that it has been built from. If the chain has been modified
+        since (by invoking :meth:`add_fallback` on any of its elements),
+        the index and the serialized sections are dropped and the 
+        index is rebuilt.
+        """
+        chain = []
+        trans = self
+        while trans:
+            chain.append(trans)
+            trans = trans._fallback
+        index = self._section_index
+        if index is not None and (len(index[0]) != len(chain) or
+            any(a is not b for a, b in zip(index[0], chain))):
+            index = None
+            self._section_json = None
+        if index is None:
+            keys = set()
+            for trans in chain:
+                keys.update(getattr(trans, "_translations", {}))
+            index = (chain, sorted(keys))
+            self._section_index = index
+        return index[1]
+
+    def section(self, prefix):
+        """
+        Return a dictionary with all keys that start with *prefix*
+        and their translations as utf-8 encoded strings. The
+        translations are resolved as by :meth:`gettext`, i.e. keys
+        defined in several properties files of the chain are mapped
+        to the value from the first file that defines them. Keys
+        that are only provided by the identity mapping at the end of
+        the chain are not included.
+        
+        Using dotted keys (e.g. "``menu.file.open``"), passing
+        "``menu.file.``" as *prefix* returns the complete 
+        "``menu.file``" section.
+        """
+        if isinstance(prefix, unicode):
+            prefix = prefix.encode("utf-8")
+        keys = self._index()
+        res = dict()
+        for i in xrange(bisect.bisect_left(keys, prefix), len(keys)):
+            key = keys[i]
+            if not key.startswith(prefix):
+                break
+            res[key] = self.gettext(key)
+        return res
+
+    def section_json(self, prefix):
+        """
+        Return the result of :meth:`section` serialized as JSON
+        object. The serialized sections are cached, so repeatedly
+        requesting the same section (e.g. for sending it to a browser)
+        is cheap. The cache holds the most recently serialized 
+        :attr:`section_json_cache_size` sections, so passing arbitrary
+        prefixes cannot make it grow without limit.
+        """
+        if isinstance(prefix, unicode):
+            prefix = prefix.encode("utf-8")
+        self._index() # drops serialized sections if chain has changed
+        with Translations._cache_lock:
+            cache = self._section_json
+            if cache is None:
+                cache = self._section_json = collections.OrderedDict()
+            res = cache.pop(prefix, None)
+            if res is not None:
+                cache[prefix] = res # re-insert as most recently used
+                return res
+        res = json.dumps(self.section(prefix), sort_keys=True)
+        with Translations._cache_lock:
+            while len(cache) >= self.section_json_cache_size:
+                cache.popitem(last=False)
+            cache[prefix] = res
+        return res
+
+    def memory_usage(self):
+        """
+        Return a list with a tuple (*language*, *source*, *entries*, 
+        *size*) for each element of the chain starting with this 
+        instance. *language* is the language specification of the
+        properties file that the element has been created from
+        (``None`` for the file without language specification) and 
+        *source* is the file's path (which may point into a zip 
+        archive). For elements not created by :func:`translation`
+        (including the final :class:`BaseTranslations`), *language*
+        is the element's :attr:`language` and *source* is ``None``.
+        
+        *entries* is the number of mappings defined by the element
+        and *size* is the number of bytes used by its dictionary 
+        and the keys and values in it. Objects shared by several 
+        elements are attributed to the first element that references 
+        them. In addition, *size* includes the list of keys that the 
+        element keeps for :meth:`section` (but not the keys themselves, 
+        which are attributed to the elements that define them) and 
+        the sections serialized by :meth:`section_json`.
+        """
+        seen = set()
+        def size_of(objs):
+            size = 0
+            for obj in objs:
+                if id(obj) not in seen:
+                    seen.add(id(obj))
+                    size += sys.getsizeof(obj)
+            return size
+        chain = []
+        trans = self
+        while trans:
+            chain.append(trans)
+            trans = trans._fallback
+        sizes = []
+        for trans in chain: # the elements' own mappings
+            mapping = getattr(trans, "_translations", None)
+            size = 0
+            if mapping is not None:
+                size += size_of([mapping])
+                for item in mapping.iteritems():
+                    size += size_of(item)
+            sizes.append(size)
+        res = []
+        for trans, size in zip(chain, sizes): # the elements' caches
+            index = trans._section_index
+            if index is not None:
+                size += size_of([index[1]])
+            cache = trans._section_json
+            if cache is not None:
+                size += size_of([cache])
+                for item in cache.iteritems():
+                    size += size_of(item)
+            language, source = trans._origin or (trans.language, None)
+            res.append((language, source, 
+                        len(getattr(trans, "_translations", ())), size))
+        return res
 
 class Translations(BaseTranslations):
     """
@@ -148,15 +305,35 @@ class Translations(BaseTranslations):
     _cache_lock = threading.RLock()
     _cache = dict()
 
-    def __init__(self, fp, fallback=None, language=None):
+    _parallel_min_chunk = 1 << 20
+
+    def __init__(self, fp, fallback=None, language=None, parallel=False):
+        """
+        Create a new object with the mapping read from file object *fp*.
+        
+        If *parallel* is ``True`` or a number of processes, large
+        files are split in chunks that are parsed by a pool of 
+        processes (as many as CPUs are available if *parallel* is 
+        ``True``). The file's encoding must represent ``\\n`` and ``\\``
+        as single bytes that do not occur as part of other characters
+        (as is the case for iso-8859-1 and utf-8).
+        """
         super(Translations, self).__init__(language)
         self._fallback = fallback
-        self._translations = self._parse(fp)
+        if parallel:
+            self._translations = self._parse_parallel \
+                (fp, None if parallel is True else parallel)
+        else:
+            self._translations = self._parse(fp)[0]
         
-    def _parse(self, fp):
+    @staticmethod
+    def _parse(fp, encoding="iso-8859-1", coding_lines=2):
         """
-        Parse the file object *fp* as a properties file and insert
-        the key value pairs found in this instance's dictionary.
+        Parse the file object *fp* as a properties file and return
+        the dictionary with the key value pairs found and the encoding
+        used for the last line. The file is assumed to be encoded
+        with *encoding* unless a magic comment in one of the first 
+        *coding_lines* lines specifies a different encoding.
         """
         res = dict()
         key = u""
@@ -168,7 +345,6 @@ class Translations(BaseTranslations):
         ignore_comment = False
         unicode_digits = 0
         unicode_buffer = ""
-        encoding = "iso-8859-1"
         line_count = 0
         while True:
             line = fp.readline()
@@ -198,8 +374,9 @@ class Translations(BaseTranslations):
                         skip_ws = False # Found first non white space character
                         if not ignore_comment: # i.e. is not continuation line
                             if c == '#' or c == '!': # Skip comment lines
-                                if line_count <= 2:
-                                    mo = self._codingRegex.search(line)
+                                if line_count <= coding_lines:
+                                    mo = Translations._codingRegex\
+                                        .search(line)
                                     if mo:
                                         encoding = mo.group(1) 
                                 break
@@ -225,12 +402,12 @@ class Translations(BaseTranslations):
                         skip_ws = True # skip white space before value
                         continue
                     if c == '\n': # not escaped, end of key/value pair
-                        if key != "":
+                        if key != "": # entries with empty key are ignored
                             res[key.encode("utf-8")] = value.encode("utf-8")
-                            key = ""
-                            value = ""
-                            pending_ws = ""
-                            have_key = False
+                        key = ""
+                        value = ""
+                        pending_ws = ""
+                        have_key = False
                         break # continue with next line
                 if not have_key:
                     key += (pending_ws + c)
@@ -238,6 +415,78 @@ class Translations(BaseTranslations):
                     value += (pending_ws + c)
                 pending_ws = ""
 
+        return (res, encoding)
+
+    @classmethod
+    def _parse_parallel(cls, fp, processes=None):
+        """
+        Parse the file object *fp* as a properties file by splitting
+        it in chunks that are parsed in a pool of *processes*
+        processes. Chunks are only split at lines that cannot be
+        continuation lines and the results are merged in order, so
+        the result is the same as the one from :meth:`_parse`.
+        
+        If *fp* is a regular file, it is mapped into memory and the
+        workers map the file themselves, so the data is neither copied
+        nor passed to the workers. Other file objects are read 
+        completely and the data is passed to each worker once. 
+        """
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if isinstance(fp, file):
+            size = os.fstat(fp.fileno()).st_size
+            if fp.tell() != 0 or size < 2 * cls._parallel_min_chunk:
+                return cls._parse(fp)[0]
+            path = os.path.abspath(fp.name)
+            data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            path = None
+            data = fp.read()
+        try:
+            # The encoding can only be changed in the first two lines
+            head_end = data.find("\n", data.find("\n") + 1) + 1
+            if head_end == 0:
+                head_end = len(data)
+            encoding = cls._parse(io.BytesIO(data[:head_end]))[1]
+            # Find the chunks' boundaries
+            chunk_size = max(len(data) // processes, cls._parallel_min_chunk)
+            bounds = [0]
+            while True:
+                nl = data.find \
+                    ("\n", max(bounds[-1] + chunk_size, head_end) - 1)
+                while nl >= 0:
+                    # A line is the start of an entry if the preceding line
+                    # cannot end with an escape (or a pending unicode escape).
+                    line = data[data.rfind("\n", 0, nl) + 1:nl].rstrip("\r")
+                    if not "\\" in line[-6:]:
+                        break
+                    nl = data.find("\n", nl + 1)
+                if nl < 0 or nl + 1 >= len(data):
+                    break
+                bounds.append(nl + 1)
+            bounds.append(len(data))
+            if len(bounds) == 2:
+                return cls._parse(io.BytesIO(data[:]))[0]
+            chunks = [(0, bounds[1], "iso-8859-1", 2)]
+            for start, end in zip(bounds[1:-1], bounds[2:]):
+                chunks.append((start, end, encoding, 0))
+            pool = multiprocessing.Pool(min(processes, len(chunks)),
+                                        _init_parse_worker, 
+                                        (path, None if path else data))
+            try:
+                results = pool.map(_parse_chunk, chunks)
+                pool.close()
+            except:
+                pool.terminate()
+                raise
+            finally:
+                pool.join()
+        finally:
+            if path:
+                data.close()
+        res = results[0]
+        for r in results[1:]: # later definitions win
+            res.update(r)
         return res
 
     def ugettext(self, message):
@@ -267,7 +516,32 @@ class Translations(BaseTranslations):
         return super(Translations, self).gettext(message)
 
 
-def translation(basename, props_dir, languages, key_language=None):
+_parse_source = None
+
+def _init_parse_worker(path, data):
+    """
+    Initialize a worker process of :meth:`Translations._parse_parallel`
+    with the file to parse, given either by its *path* or its *data*.
+    """
+    global _parse_source
+    if path:
+        with open(path, "rb") as fp:
+            _parse_source = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    else:
+        _parse_source = data
+
+def _parse_chunk(chunk):
+    """
+    Parse a chunk of a properties file in a worker process.
+    *chunk* is a tuple with the chunk's start and end, the encoding 
+    and the number of lines that may contain a magic comment.
+    """
+    start, end, encoding, coding_lines = chunk
+    return Translations._parse(io.BytesIO(_parse_source[start:end]), 
+                               encoding, coding_lines)[0]
+
+def translation(basename, props_dir, languages, key_language=None,
+                parallel=False, compact=False):
     """
     Return a chain of :class:`Translations` instances that are created 
     from the properties files with the given *basename* in the directory
@@ -314,6 +588,33 @@ def translation(basename, props_dir, languages, key_language=None):
     directory in the list as described above. Starting with the second
     directory in the list, each translation found
     is appended to the first translation as a fallback. 
+    
+    A directory may also be located in a zip archive, i.e. *props_dir*
+    may be a path such as "``/path/to/app.pyz/package``". This is
+    what ``__file__`` looks like for modules imported from a zipapp or
+    a zipped package, so passing ``__file__`` works in this case as well.
+    The archive's directory is read once and kept in memory, the 
+    properties files are read directly from the archive.
+    
+    If *parallel* is ``True`` or a number of processes, very large 
+    properties files are parsed in parallel as described for 
+    :class:`Translations`. The cache is not locked while the chain
+    is created in this case, so other lookups can proceed. Note that
+    on POSIX systems the worker processes are forked. If other
+    threads hold locks at that time, these locks remain held in the
+    workers. This is harmless for the workers' parsing code, but 
+    should be kept in mind if other code is invoked in the workers
+    (e.g. by logging handlers).
+    
+    If *compact* is ``True``, the memory used by the chain is reduced
+    by interning the values, thus sharing equal values between all
+    translations loaded this way, and by dropping mappings that 
+    define the same value as the next properties file in the chain.
+    Use :meth:`~BaseTranslations.memory_usage` to find out how much 
+    memory is used by the elements of a chain. Compacted chains are
+    cached independently of chains obtained with *compact* being 
+    ``False``, i.e. a chain returned to a caller is never modified
+    by a later request for a compacted chain.
     """
     with Translations._cache_lock:
         # make sure we have a directory list
@@ -321,7 +622,8 @@ def translation(basename, props_dir, languages, key_language=None):
         # try to find in cache
         lang_hash = ";".join(languages)
         props_hash = ";".join(dirs)
-        trans = Translations._cache.get((basename, props_hash, lang_hash), None)
+        trans = Translations._cache.get\
+            ((basename, props_hash, lang_hash, compact), None)
         if trans:
             return trans
         # Normalize languages
@@ -333,39 +635,92 @@ def translation(basename, props_dir, languages, key_language=None):
             langs_norm.append("_".join(parts))
         lang_norm_hash = ";".join(langs_norm)
         trans = Translations._cache.get\
-            ((basename, props_hash, lang_norm_hash), None)
+            ((basename, props_hash, lang_norm_hash, compact), None)
         if trans:
-            Translations._cache[(basename, props_hash, lang_hash)]\
+            Translations._cache[(basename, props_hash, lang_hash, compact)]\
                 = trans # faster next time
             return trans
+        if not parallel:
+            trans = _translation_chain(basename, dirs, langs_norm, 
+                                       key_language, parallel, compact)
+            Translations._cache\
+                [(basename, props_hash, lang_hash, compact)] = trans
+            Translations._cache\
+                [(basename, props_hash, lang_norm_hash, compact)] = trans
+            return trans
 
-        last_dir = len(dirs) - 1
-        trans = None
-        for i, d in enumerate(dirs):
-            t = _translation(basename, d, langs_norm,
-                             (key_language if i == last_dir else None))
-            if not trans:
-                trans = t
-            else:
-                trans._add_fallback_unchecked(t)
-        
-        Translations._cache[(basename, props_hash, lang_hash)] = trans    
-        Translations._cache[(basename, props_hash, lang_norm_hash)] = trans    
+    # Parsing large files in parallel takes some time, don't block 
+    # other lookups meanwhile.
+    trans = _translation_chain(basename, dirs, langs_norm, 
+                               key_language, parallel, compact)
+    with Translations._cache_lock:
+        # Use the chain created by a concurrent invocation, if any
+        trans = Translations._cache.setdefault\
+            ((basename, props_hash, lang_norm_hash, compact), trans)
+        Translations._cache[(basename, props_hash, lang_hash, compact)] \
+            = trans
     return trans
 
-def _translation(basename, props_dir, languages, key_language=None):
+def _translation_chain(basename, dirs, languages, key_language, parallel,
+                       compact):
+    """
+    Create the chain of translations for the properties directories
+    *dirs* as described for :func:`translation`.
+    """
+    last_dir = len(dirs) - 1
+    trans = None
+    for i, d in enumerate(dirs):
+        t = _translation(basename, d, languages,
+                         (key_language if i == last_dir else None),
+                         parallel)
+        if not trans:
+            trans = t
+        else:
+            trans._add_fallback_unchecked(t)
+    if compact:
+        _compact(trans)
+    return trans
+
+def _compact(trans):
+    """
+    Intern the values of all elements of the chain starting with
+    *trans* and drop the mappings that are the same as the mapping
+    provided by the remainder of the chain. Indices and serialized
+    sections still referring to the original values are dropped.
+    """
+    while trans:
+        mapping = getattr(trans, "_translations", None)
+        if mapping is not None:
+            compacted = dict()
+            for key, value in mapping.iteritems():
+                inherited = None
+                fallback = trans._fallback
+                while fallback:
+                    inherited = getattr(fallback, "_translations", {})\
+                        .get(key, None)
+                    if inherited is not None:
+                        break
+                    fallback = fallback._fallback
+                if inherited != value:
+                    compacted[key] = intern(value)
+            trans._translations = compacted
+        trans._section_index = None
+        trans._section_json = None
+        trans = trans._fallback
+
+def _translation(basename, props_dir, languages, key_language=None,
+                 parallel=False):
     """
     See above. This function handles a single properties directory.
     """
-    props_dir = os.path.abspath(props_dir)
-    if os.path.isfile(props_dir):
-        props_dir = os.path.dirname(props_dir)
+    props_dir = _props_location(props_dir)
     trans = None
     use_key_as_lang = False
     for lang in languages:
         while True:
             trans = _try_file \
-                (props_dir, basename + "_" + lang + ".properties", lang, trans)
+                (props_dir, basename + "_" + lang + ".properties", lang, trans,
+                 parallel)
             # Use identity mapping instead (or in addition to) file?
             if lang == key_language:
                 use_key_as_lang = True
@@ -376,7 +731,8 @@ def _translation(basename, props_dir, languages, key_language=None):
                 break
             lang = lang_up
     # Finally try properties file without language specification
-    trans = _try_file(props_dir, basename + ".properties", None, trans)
+    trans = _try_file(props_dir, basename + ".properties", None, trans,
+                      parallel)
     if trans:
         trans._add_fallback_unchecked(BaseTranslations()) # last resort
     else:
@@ -386,17 +742,131 @@ def _translation(basename, props_dir, languages, key_language=None):
             trans = BaseTranslations()
     return trans
 
-def _try_file (props_dir, props_file, lang, trans):
+def _try_file (props_dir, props_file, lang, trans, parallel=False):
     try:
-        with open(os.path.join(props_dir, props_file)) as fp:
-            if trans:
-                trans._add_fallback_unchecked(Translations(fp))
-            else:
-                trans = Translations(fp, language=lang)
-    except IOError:
+        with _open_props(props_dir, props_file) as fp:
+            t = Translations(fp, language=(None if trans else lang),
+                             parallel=parallel)
+        t._origin = (lang, _props_path(props_dir, props_file))
+        if trans:
+            trans._add_fallback_unchecked(t)
+        else:
+            trans = t
+    except (IOError, zipfile.BadZipfile, zipfile.LargeZipFile):
         pass
     return trans
+
+
+class _Archive(object):
+    """
+    Provides access to the members of a zip archive. The archive's
+    directory is read once and indexed by the directories in the
+    archive. Members are read completely into memory buffers.
+    *signature* identifies the state of the archive file that
+    has been indexed.
+    """
+
+    def __init__(self, path, signature):
+        self.path = path
+        self.signature = signature
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(path)
+        self._dirs = { "": dict() }
+        for info in self._zip.infolist():
+            d, name = posixpath.split(info.filename)
+            if name:
+                self._dirs.setdefault(d, dict())[name] = info
+            else: # explicit directory entry
+                self._dirs.setdefault(d, dict())
+            # Make sure that all parent directories are indexed
+            d = posixpath.dirname(d)
+            while d and not self._dirs.has_key(d):
+                self._dirs[d] = dict()
+                d = posixpath.dirname(d)
+
+    def isdir(self, member_dir):
+        return member_dir in self._dirs
+
+    def isfile(self, member_dir, name):
+        return name in self._dirs.get(member_dir, {})
+
+    def listdir(self, member_dir):
+        return self._dirs.get(member_dir, {}).keys()
+
+    def open(self, member_dir, name):
+        info = self._dirs.get(member_dir, {}).get(name, None)
+        if info is None:
+            raise IOError("No such file in archive: " 
+                          + posixpath.join(member_dir, name))
+        with self._lock: # ZipFile isn't thread-safe
+            try:
+                return io.BytesIO(self._zip.read(info))
+            except (RuntimeError, zipfile.BadZipfile, zipfile.LargeZipFile):
+                # E.g. closed, modified in place or (unexpectedly) encrypted
+                raise IOError("Cannot read from archive: " 
+                              + posixpath.join(member_dir, name))
+
+_archives_lock = threading.Lock()
+_archives = dict()
+
+def _props_location(props_dir):
+    """
+    Return the location of the properties files described by 
+    *props_dir*. This is either the absolute path of a directory or,
+    if *props_dir* refers to a location in a zip archive, a tuple
+    with the :class:`_Archive` and the directory within the archive.
+    If *props_dir* refers to a file, the file's directory is used.
+    """
+    props_dir = os.path.abspath(props_dir)
+    path = props_dir
+    members = []
+    while True:
+        if os.path.isfile(path):
+            break
+        if os.path.isdir(path):
+            return props_dir
+        head, tail = os.path.split(path)
+        if head == path:
+            return props_dir
+        members.insert(0, tail)
+        path = head
+    if not _archives.has_key(path) and not zipfile.is_zipfile(path):
+        # A regular file (or nothing we can handle)
+        return props_dir if members else os.path.dirname(props_dir)
+    with _archives_lock:
+        archive = _archives.get(path, None)
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_mtime, stat.st_size)
+            if archive is None or archive.signature != signature:
+                # The archive is new or has been modified. A replaced
+                # archive may still be used by other threads, it is
+                # closed when no longer referenced.
+                archive = _archives[path] = _Archive(path, signature)
+        except (OSError, zipfile.BadZipfile, zipfile.LargeZipFile):
+            return props_dir
+    member_dir = "/".join(members)
+    if not archive.isdir(member_dir) \
+        and archive.isfile(*posixpath.split(member_dir)):
+        member_dir = posixpath.dirname(member_dir) # e.g. a module's __file__
+    return (archive, member_dir)
+
+def _open_props(props_dir, props_file):
+    if isinstance(props_dir, tuple):
+        return props_dir[0].open(props_dir[1], props_file)
+    return open(os.path.join(props_dir, props_file))
         
+def _props_path(props_dir, props_file):
+    if isinstance(props_dir, tuple):
+        return os.path.join(props_dir[0].path, 
+                            *(props_dir[1].split("/") + [props_file]))
+    return os.path.join(props_dir, props_file)
+
+def _list_props(props_dir):
+    if isinstance(props_dir, tuple):
+        return props_dir[0].listdir(props_dir[1])
+    return os.listdir(props_dir)
+
 _props_files_pattern \
     = re.compile("(_[a-z]{2}(_[a-zA-Z]{2}(_.*)?)?)\.properties$")
 
@@ -414,9 +884,7 @@ def available_translations(basename, props_dir, key_language=None):
         res.add(key_language)
     dirs = props_dir if isinstance(props_dir, list) else [props_dir]
     for dir in dirs:
-        if os.path.isfile(dir):
-            dir = os.path.dirname(dir)
-        for f in os.listdir(dir):
+        for f in _list_props(_props_location(dir)):
             if not f.startswith(basename):
                 continue
             m = _props_files_pattern.match(f[len(basename):])
@@ -3,7 +3,11 @@
 .. codeauthor: mnl
 """
 import unittest
+import io
 import os
+import shutil
+import tempfile
+import zipfile
 from rbtranslations import Translations
 import rbtranslations
 
@@ -30,6 +34,56 @@ class Test(unittest.TestCase):
         self.assertEqual(res._translations[u"π".encode("utf-8")], "pi")
         self.assertEqual(res._translations["umlaute"], u"äöüÄÖÜ".encode("utf-8"))
 
+    def testArchiveDirs(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            archive = os.path.join(tmp_dir, "app.zip")
+            with zipfile.ZipFile(archive, "w") as zf:
+                zf.writestr("a/b/c/test.properties", "pancake = c\n")
+            location = rbtranslations._props_location\
+                (os.path.join(archive, "a"))
+            self.assertEqual(location[1], "a")
+            self.assertTrue(location[0].isdir("a"))
+            self.assertTrue(location[0].isdir("a/b"))
+            self.assertTrue(location[0].isdir("a/b/c"))
+            self.assertEqual(rbtranslations.available_translations\
+                ("test", os.path.join(archive, "a", "b")), set())
+        finally:
+            rbtranslations._archives.clear()
+            shutil.rmtree(tmp_dir)
+
+    def testParallel(self):
+        min_chunk = Translations._parallel_min_chunk
+        Translations._parallel_min_chunk = 1
+        try:
+            for name in ["trans.properties", "trans-utf8.properties"]:
+                inp_file = os.path.abspath \
+                    (os.path.join(os.path.dirname(__file__), name))
+                with open(inp_file) as fp:
+                    expected = Translations(fp)._translations
+                with open(inp_file) as fp:
+                    res = Translations(fp, parallel=4)
+                self.assertEqual(res._translations, expected)
+            data = "# coding: utf-8\n" + "".join \
+                ("key%d = π\\\n  # %d\n" % (i % 7, i) for i in range(50))
+            res = Translations(io.BytesIO(data), parallel=3)
+            self.assertEqual(res._translations,
+                             Translations(io.BytesIO(data))._translations)
+            self.assertEqual(res._translations["key0"], "π# 49")
+            data = "a=1\n=x\n" + "".join("k%d=v\n" % i for i in range(20))
+            res = Translations(io.BytesIO(data), parallel=3)
+            self.assertEqual(res._translations,
+                             Translations(io.BytesIO(data))._translations)
+            self.assertEqual(len(res._translations), 21)
+            trans = rbtranslations.translation("test", __file__, ["de_AT"],
+                                               parallel=2)
+            self.assertEqual(trans.gettext("mobile phone"), "Handy")
+            self.assertTrue(trans is rbtranslations.translation\
+                ("test", __file__, ["de_AT"]))
+        finally:
+            Translations._parallel_min_chunk = min_chunk
+            Translations._cache.clear()
+
     def testFound(self):
         trans = rbtranslations.translation("test", __file__, ["de_AT", "fr_FR"])
         self.assertEqual(trans.language, "de_AT")
@@ -47,11 +101,144 @@ class Test(unittest.TestCase):
         self.assertEqual(trans.ugettext(u"π"), u"pi")
         self.assertEqual(trans.ugettext(u"π".encode("utf-8")), u"pi")
 
+    def testSection(self):
+        trans = rbtranslations.translation("menu", __file__, ["de"])
+        self.assertEqual(trans.section("menu.file."),
+                         {"menu.file.open": u"Öffnen".encode("utf-8"),
+                          "menu.file.close": "Close"})
+        self.assertEqual(len(trans.section(u"menu")), 5)
+        self.assertEqual(trans.section("menu.view."), {})
+        self.assertEqual(trans.section_json("menu.edit."),
+                         '{"menu.edit.copy": "Kopieren"}')
+        self.assertTrue(trans.section_json("menu.edit.")
+                        is trans.section_json("menu.edit."))
+        for i in range(trans.section_json_cache_size + 10):
+            trans.section_json("menu.%d" % i)
+        self.assertEqual(len(trans._section_json),
+                         trans.section_json_cache_size)
+
+    def testSectionModifiedChain(self):
+        trans = Translations(io.BytesIO("menu.a = 1\n"),
+                             Translations(io.BytesIO("menu.b = 2\n"),
+                                          rbtranslations.BaseTranslations()))
+        self.assertEqual(trans.section("menu."),
+                         {"menu.a": "1", "menu.b": "2"})
+        self.assertEqual(trans.section_json("menu."),
+                         '{"menu.a": "1", "menu.b": "2"}')
+        trans._fallback.add_fallback(Translations(io.BytesIO("menu.c = 3\n")))
+        self.assertEqual(trans.gettext("menu.c"), "3")
+        self.assertEqual(trans.section("menu."),
+                         {"menu.a": "1", "menu.b": "2", "menu.c": "3"})
+        self.assertEqual(trans.section_json("menu."),
+                         '{"menu.a": "1", "menu.b": "2", "menu.c": "3"}')
+
+    def testCompact(self):
+        trans = rbtranslations.translation("menu", __file__, ["de_AT"])
+        usage = trans.memory_usage()
+        tests_dir = os.path.dirname(os.path.abspath(__file__))
+        self.assertEqual([(l, s, e) for l, s, e, _ in usage],
+            [("de_AT", os.path.join(tests_dir, "menu_de_AT.properties"), 2),
+             ("de", os.path.join(tests_dir, "menu_de.properties"), 3),
+             (None, os.path.join(tests_dir, "menu.properties"), 5),
+             (None, None, 0)])
+        section = trans.section("menu.")
+        trans.section_json("menu.")
+        # Only the head's size includes the section caches
+        with_sections = trans.memory_usage()
+        self.assertTrue(with_sections[0][3] > usage[0][3])
+        self.assertEqual(with_sections[1:], usage[1:])
+        try:
+            compacted = rbtranslations.translation\
+                ("menu", __file__, ["de_AT"], compact=True)
+            self.assertFalse(compacted is trans)
+            self.assertEqual(trans.memory_usage()[0][2], 2)
+            self.assertEqual(compacted.memory_usage()[0][2], 1)
+            self.assertTrue(compacted.memory_usage()[0][3] < usage[0][3])
+            self.assertEqual(compacted.section("menu."), section)
+            self.assertEqual(compacted.gettext("menu.edit.copy"), "Kopieren")
+            self.assertEqual(compacted.ugettext("menu.file.close"), 
+                             u"Schließen")
+            self.assertTrue(compacted._fallback._translations\
+                            ["menu.edit.copy"] is intern("Kopieren"))
+            # Compacting drops the indices built for the original values
+            rbtranslations._compact(trans)
+            self.assertTrue(trans._section_index is None)
+            self.assertTrue(trans._section_json is None)
+            self.assertEqual(trans.memory_usage()[0][2], 1)
+            self.assertTrue(trans.memory_usage()[0][3] < usage[0][3])
+        finally:
+            Translations._cache.clear()
+
     def testAvailable(self):
         available = rbtranslations\
             .available_translations("test", __file__, "en")
         self.assertEqual(available, set(("en", "de", "de_AT", "fr")))
 
+    def testArchive(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            archive = os.path.join(tmp_dir, "app.zip")
+            with zipfile.ZipFile(archive, "w") as zf:
+                for f in os.listdir(os.path.dirname(__file__)):
+                    if f.startswith("test") and f.endswith(".properties"):
+                        zf.write(os.path.join(os.path.dirname(__file__), f),
+                                 "pkg/" + f)
+                zf.writestr("pkg/module.py", "")
+            location = os.path.join(archive, "pkg", "module.py")
+            trans = rbtranslations.translation\
+                ("test", location, ["de_AT", "fr_FR"])
+            self.assertEqual(trans.language, "de_AT")
+            self.assertEqual(trans.memory_usage()[0][:2], 
+                ("de_AT", os.path.join(archive, "pkg", 
+                                       "test_de_AT.properties")))
+            self.assertEqual(trans.gettext("pancake"), "Palatschinken")
+            self.assertEqual(trans.ugettext("computer"), "ordinateur")
+            self.assertEqual(trans.ugettext(u"π"), u"pi")
+            trans = rbtranslations.translation\
+                ("test", os.path.join(archive, "pkg", "test.properties"), 
+                 ["de"])
+            self.assertEqual(trans.gettext("pancake"), "Pfannkuchen")
+            available = rbtranslations.available_translations\
+                ("test", os.path.join(archive, "pkg"), "en")
+            self.assertEqual(available, set(("en", "de", "de_AT", "fr")))
+            location = rbtranslations._props_location(location)
+            # Directories without files, archive modified after lookup
+            with zipfile.ZipFile(archive, "w") as zf:
+                zf.writestr("test.properties", "pancake = root\n")
+                zf.writestr("lib/pkg/sub/test_de.properties", 
+                            "pancake = sub\n")
+            old_archive = location[0]
+            location = rbtranslations._props_location\
+                (os.path.join(archive, "lib", "pkg"))
+            self.assertEqual(location[1], "lib/pkg")
+            self.assertTrue(location[0].isdir("lib"))
+            self.assertTrue(location[0].isdir("lib/pkg/sub"))
+            self.assertFalse(location[0].isdir("lib/pkg/sub/test_de"))
+            # Replaced archives are not closed, but reading from the
+            # rewritten file fails
+            self.assertFalse(old_archive is location[0])
+            self.assertFalse(old_archive._zip.fp is None)
+            self.assertRaises(IOError, old_archive.open, 
+                              "pkg", "test.properties")
+            old_archive._zip.close()
+            self.assertRaises(IOError, old_archive.open, 
+                              "pkg", "test.properties")
+            self.assertEqual(rbtranslations.available_translations\
+                ("test", os.path.join(archive, "lib", "pkg")), set())
+            self.assertEqual(rbtranslations.available_translations\
+                ("test", os.path.join(archive, "lib", "pkg", "sub")), 
+                set(("de",)))
+            trans = rbtranslations.translation\
+                ("test", os.path.join(archive, "lib", "pkg"), ["de"])
+            self.assertEqual(trans.gettext("pancake"), "pancake")
+            trans = rbtranslations.translation\
+                ("test", os.path.join(archive, "lib", "pkg", "sub"), ["de"])
+            self.assertEqual(trans.gettext("pancake"), "sub")
+        finally:
+            rbtranslations._archives.clear()
+            Translations._cache.clear()
+            shutil.rmtree(tmp_dir)
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testParse']
     unittest.main()
\ No newline at end of file